@@ -1,18 +1,172 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 import json
 import time
-from typing import List, Dict, Optional
+import asyncio
+import pandas as pd
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Union
+
+try:
+    import aiohttp
+except ImportError:  # only needed for batch_search
+    aiohttp = None
+
+try:
+    from requests_cache import CachedSession
+except ImportError:  # responses are then always fetched from the API
+    CachedSession = None
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib json module
+    orjson = None
+
+@dataclass(slots=True)
+class PlaceInfo:
+    """Key information about a place, as returned by format_place_info"""
+    name: str
+    place_id: str
+    rating: Union[float, str]
+    user_ratings_total: int
+    price_level: Union[int, str]
+    types: List[str]
+    vicinity: str
+    lat: Union[float, str]
+    lng: Union[float, str]
+    open_now: Union[bool, str]
+    photos: bool
+    
+    def to_dict(self) -> Dict:
+        """
+        Convert to the dict layout written to the JSON output file
+        
+        Returns:
+            Dict: Formatted place information with coordinates nested under 'geometry'
+        """
+        return {
+            'name': self.name,
+            'place_id': self.place_id,
+            'rating': self.rating,
+            'user_ratings_total': self.user_ratings_total,
+            'price_level': self.price_level,
+            'types': self.types,
+            'vicinity': self.vicinity,
+            'geometry': {
+                'lat': self.lat,
+                'lng': self.lng
+            },
+            'open_now': self.open_now,
+            'photos': self.photos
+        }
+
+def _is_cacheable(response) -> bool:
+    """Only cache successful searches, never "page token not ready yet" or error responses"""
+    try:
+        data = orjson.loads(response.content) if orjson is not None else response.json()
+        return data.get('status') in ('OK', 'ZERO_RESULTS')
+    except ValueError:
+        return False
 
 class GooglePlacesNearbySearch:
-    def __init__(self, api_key: str):
+    # Normalized API fields used by format_places_batch, mapped to output column names
+    BATCH_COLUMNS = {
+        'name': 'name',
+        'place_id': 'place_id',
+        'rating': 'rating',
+        'user_ratings_total': 'user_ratings_total',
+        'price_level': 'price_level',
+        'types': 'types',
+        'vicinity': 'vicinity',
+        'geometry.location.lat': 'lat',
+        'geometry.location.lng': 'lng',
+        'opening_hours.open_now': 'open_now',
+        'photos': 'photos'
+    }
+    
+    def __init__(self, api_key: str, use_cache: bool = True, cache_expire_after: int = 3600):
         """
         Initialize the Google Places API client
         
         Args:
             api_key (str): Your Google Maps API key
+            use_cache (bool): Cache API responses locally (requires requests-cache)
+            cache_expire_after (int): Seconds before a cached response is fetched again
         """
         self.api_key = api_key
         self.base_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+        
+        # Reuse one pooled connection across paginated requests, answering
+        # repeated searches from a local cache when requests-cache is installed
+        self.cache_enabled = use_cache and CachedSession is not None
+        if self.cache_enabled:
+            self.session = CachedSession(
+                'places_cache',
+                backend='sqlite',
+                expire_after=cache_expire_after,
+                allowable_methods=['GET'],
+                ignored_parameters=['key'],
+                filter_fn=_is_cacheable
+            )
+        else:
+            self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        
+        # Backoff schedule (seconds) while waiting for a page token to become valid
+        self.page_token_retry_delays = (0.4, 0.6, 1.0, 1.5)
+    
+    def close(self):
+        """Release pooled HTTP connections"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _build_params(self,
+                      latitude: float,
+                      longitude: float,
+                      radius: int,
+                      place_type: Optional[str],
+                      keyword: Optional[str],
+                      min_price: Optional[int],
+                      max_price: Optional[int],
+                      open_now: bool) -> Dict:
+        """
+        Build the query parameters for a nearby search request
+        
+        Returns:
+            Dict: Query parameters for the Places API
+        """
+        # Build parameters
+        params = {
+            'location': f"{latitude},{longitude}",
+            'radius': radius,
+            'key': self.api_key
+        }
+        
+        # Add optional parameters
+        if place_type:
+            params['type'] = place_type
+        if keyword:
+            params['keyword'] = keyword
+        if min_price is not None:
+            params['minprice'] = min_price
+        if max_price is not None:
+            params['maxprice'] = max_price
+        if open_now:
+            params['opennow'] = 'true'
+        
+        return params
     
     def search_nearby(self, 
                      latitude: float, 
@@ -22,7 +176,8 @@ class GooglePlacesNearbySearch:
                      keyword: Optional[str] = None,
                      min_price: Optional[int] = None,
                      max_price: Optional[int] = None,
-                     open_now: bool = False) -> List[Dict]:
+                     open_now: bool = False,
+                     refresh: bool = False) -> List[Dict]:
         """
         Search for places near a specific location
         
@@ -35,29 +190,14 @@ class GooglePlacesNearbySearch:
             min_price (int, optional): Minimum price level (0-4)
             max_price (int, optional): Maximum price level (0-4)
             open_now (bool): Only return places that are open now
+            refresh (bool): Bypass the response cache and fetch fresh results
             
         Returns:
             List[Dict]: List of places found
         """
         
-        # Build parameters
-        params = {
-            'location': f"{latitude},{longitude}",
-            'radius': radius,
-            'key': self.api_key
-        }
-        
-        # Add optional parameters
-        if place_type:
-            params['type'] = place_type
-        if keyword:
-            params['keyword'] = keyword
-        if min_price is not None:
-            params['minprice'] = min_price
-        if max_price is not None:
-            params['maxprice'] = max_price
-        if open_now:
-            params['opennow'] = 'true'
+        params = self._build_params(latitude, longitude, radius, place_type,
+                                    keyword, min_price, max_price, open_now)
         
         all_results = []
         next_page_token = None
@@ -66,15 +206,18 @@ class GooglePlacesNearbySearch:
             # Add page token if we have one
             if next_page_token:
                 params['pagetoken'] = next_page_token
-                # Google requires a short delay before using page token
-                time.sleep(2)
             
             try:
                 # Make the API request
-                response = requests.get(self.base_url, params=params)
-                response.raise_for_status()
+                data = self._fetch_page(params, refresh)
                 
-                data = response.json()
+                # A fresh page token takes a moment to activate; poll until it does
+                if next_page_token:
+                    for delay in self.page_token_retry_delays:
+                        if data['status'] != 'INVALID_REQUEST':
+                            break
+                        time.sleep(delay)
+                        data = self._fetch_page(params, refresh)
                 
                 # Check if request was successful
                 if data['status'] != 'OK' and data['status'] != 'ZERO_RESULTS':
@@ -93,7 +236,8 @@ class GooglePlacesNearbySearch:
                 if not next_page_token:
                     break
                     
-            except requests.exceptions.RequestException as e:
+            except (requests.exceptions.RequestException, Urllib3HTTPError) as e:
+                # Reading the streamed body raises urllib3 errors that requests doesn't wrap
                 print(f"Request failed: {e}")
                 break
             except json.JSONDecodeError as e:
@@ -102,7 +246,152 @@ class GooglePlacesNearbySearch:
         
         return all_results
     
-    def format_place_info(self, place: Dict) -> Dict:
+    def _fetch_page(self, params: Dict, refresh: bool = False) -> Dict:
+        """
+        Request a single page of nearby search results
+        
+        Args:
+            params (Dict): Query parameters for the request
+            refresh (bool): Bypass the response cache
+            
+        Returns:
+            Dict: Decoded API response
+        """
+        request_kwargs = {'force_refresh': True} if refresh and self.cache_enabled else {}
+        
+        # Without a cache (which needs the buffered body) hand the raw byte stream
+        # straight to orjson instead of buffering it on the response first
+        stream = orjson is not None and not self.cache_enabled
+        with self.session.get(self.base_url, params=params, timeout=(3.05, 10),
+                              stream=stream, **request_kwargs) as response:
+            response.raise_for_status()
+            if stream:
+                response.raw.decode_content = True
+                return orjson.loads(response.raw.read())
+            if orjson is not None:
+                return orjson.loads(response.content)
+            return response.json()
+    
+    async def _fetch_page_async(self, session, semaphore, params: Dict) -> Dict:
+        """
+        Request a single page of nearby search results without blocking
+        
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            semaphore (asyncio.Semaphore): Limits concurrent in-flight requests
+            params (Dict): Query parameters for the request
+            
+        Returns:
+            Dict: Decoded API response
+        """
+        async with semaphore:
+            async with session.get(self.base_url, params=params) as response:
+                response.raise_for_status()
+                return await response.json(loads=orjson.loads if orjson is not None else json.loads)
+    
+    async def search_nearby_async(self, session, semaphore,
+                                  latitude: float,
+                                  longitude: float,
+                                  radius: int = 2650,
+                                  place_type: Optional[str] = None,
+                                  keyword: Optional[str] = None,
+                                  min_price: Optional[int] = None,
+                                  max_price: Optional[int] = None,
+                                  open_now: bool = False,
+                                  refresh: bool = False) -> List[Dict]:
+        """
+        Asynchronous version of search_nearby for use with batch_search
+        
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            semaphore (asyncio.Semaphore): Limits concurrent in-flight requests
+            refresh (bool): Accepted for parity with search_nearby; async searches
+                don't go through the response cache, so results are always fresh
+            (remaining arguments are the same as search_nearby)
+            
+        Returns:
+            List[Dict]: List of places found
+        """
+        params = self._build_params(latitude, longitude, radius, place_type,
+                                    keyword, min_price, max_price, open_now)
+        
+        all_results = []
+        next_page_token = None
+        
+        while True:
+            if next_page_token:
+                params['pagetoken'] = next_page_token
+            
+            try:
+                data = await self._fetch_page_async(session, semaphore, params)
+                
+                # Wait for a fresh page token to activate without holding up other searches
+                if next_page_token:
+                    for delay in self.page_token_retry_delays:
+                        if data['status'] != 'INVALID_REQUEST':
+                            break
+                        await asyncio.sleep(delay)
+                        data = await self._fetch_page_async(session, semaphore, params)
+                
+                if data['status'] != 'OK' and data['status'] != 'ZERO_RESULTS':
+                    print(f"API Error ({latitude}, {longitude}): {data['status']}")
+                    if 'error_message' in data:
+                        print(f"Error message: {data['error_message']}")
+                    break
+                
+                if 'results' in data:
+                    all_results.extend(data['results'])
+                    print(f"Found {len(data['results'])} places in this batch ({latitude}, {longitude})")
+                
+                next_page_token = data.get('next_page_token')
+                if not next_page_token:
+                    break
+                    
+            except aiohttp.ClientError as e:
+                print(f"Request failed: {e}")
+                break
+            except json.JSONDecodeError as e:
+                print(f"Failed to parse JSON response: {e}")
+                break
+        
+        return all_results
+    
+    async def _batch_search(self, points: List[Dict], max_concurrency: int) -> List[List[Dict]]:
+        """
+        Run all searches over one shared HTTP session
+        
+        Args:
+            points (List[Dict]): One dict of search_nearby_async keyword arguments per search
+            max_concurrency (int): Maximum number of requests in flight at once
+            
+        Returns:
+            List[List[Dict]]: Places found for each search, in the same order as points
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(sock_connect=3.05, sock_read=10)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            tasks = [asyncio.create_task(self.search_nearby_async(session, semaphore, **point))
+                     for point in points]
+            return await asyncio.gather(*tasks)
+    
+    def batch_search(self, points: List[Dict], max_concurrency: int = 10) -> List[List[Dict]]:
+        """
+        Run several nearby searches concurrently
+        
+        Args:
+            points (List[Dict]): One dict of search_nearby keyword arguments per search,
+                e.g. {'latitude': 47.68, 'longitude': -122.35, 'keyword': 'coffee'}
+            max_concurrency (int): Maximum number of requests in flight at once
+            
+        Returns:
+            List[List[Dict]]: Places found for each search, in the same order as points
+        """
+        if aiohttp is None:
+            raise ImportError("batch_search requires aiohttp (pip install aiohttp)")
+        return asyncio.run(self._batch_search(points, max_concurrency))
+    
+    def format_place_info(self, place: Dict) -> PlaceInfo:
         """
         Extract and format key information from a place result
         
@@ -110,23 +399,56 @@ class GooglePlacesNearbySearch:
             place (Dict): Raw place data from API
             
         Returns:
-            Dict: Formatted place information
+            PlaceInfo: Formatted place information
         """
-        return {
-            'name': place.get('name', 'N/A'),
-            'place_id': place.get('place_id', 'N/A'),
-            'rating': place.get('rating', 'N/A'),
-            'user_ratings_total': place.get('user_ratings_total', 0),
-            'price_level': place.get('price_level', 'N/A'),
-            'types': place.get('types', []),
-            'vicinity': place.get('vicinity', 'N/A'),
-            'geometry': {
-                'lat': place.get('geometry', {}).get('location', {}).get('lat', 'N/A'),
-                'lng': place.get('geometry', {}).get('location', {}).get('lng', 'N/A')
-            },
-            'open_now': place.get('opening_hours', {}).get('open_now', 'Unknown'),
-            'photos': len(place.get('photos', [])) > 0
-        }
+        location = place.get('geometry', {}).get('location', {})
+        return PlaceInfo(
+            name=place.get('name', 'N/A'),
+            place_id=place.get('place_id', 'N/A'),
+            rating=place.get('rating', 'N/A'),
+            user_ratings_total=place.get('user_ratings_total', 0),
+            price_level=place.get('price_level', 'N/A'),
+            types=place.get('types', []),
+            vicinity=place.get('vicinity', 'N/A'),
+            lat=location.get('lat', 'N/A'),
+            lng=location.get('lng', 'N/A'),
+            open_now=place.get('opening_hours', {}).get('open_now', 'Unknown'),
+            photos=len(place.get('photos', [])) > 0
+        )
+    
+    def format_places_batch(self, results: List[Dict]) -> pd.DataFrame:
+        """
+        Extract and format key information from many place results at once
+        
+        Same fields and defaults as format_place_info, with the coordinates
+        flattened into 'lat' and 'lng' columns. Ratings share one float column,
+        so a whole-number rating comes back as e.g. 3.0 rather than 3.
+        
+        Args:
+            results (List[Dict]): Raw place data from API
+            
+        Returns:
+            pd.DataFrame: One row of formatted place information per place
+        """
+        df = pd.json_normalize(results, max_level=2)
+        df = df.reindex(columns=list(self.BATCH_COLUMNS))
+        df = df.rename(columns=self.BATCH_COLUMNS)
+        
+        df['types'] = df['types'].map(lambda types: types if isinstance(types, list) else [])
+        df['photos'] = df['photos'].map(len, na_action='ignore').fillna(0) > 0
+        df['user_ratings_total'] = df['user_ratings_total'].fillna(0).astype(int)
+        # A missing price level turns the column into floats; convert the rest back to ints
+        price_level = df['price_level']
+        df['price_level'] = price_level.astype('Int64').astype(object).where(price_level.notna(), 'N/A')
+        return df.fillna({
+            'name': 'N/A',
+            'place_id': 'N/A',
+            'rating': 'N/A',
+            'vicinity': 'N/A',
+            'lat': 'N/A',
+            'lng': 'N/A',
+            'open_now': 'Unknown'
+        })
 
 def main():
     # Configuration
@@ -147,34 +469,42 @@ def main():
     print("-" * 60)
     
     # Perform the search
-    results = places_api.search_nearby(
-        latitude=latitude,
-        longitude=longitude,
-        radius=radius,
-        #place_type=place_type,
-        keyword=keyword,
-        open_now=False  # Set to True to only find places open now
-    )
+    with places_api:
+        results = places_api.search_nearby(
+            latitude=latitude,
+            longitude=longitude,
+            radius=radius,
+            #place_type=place_type,
+            keyword=keyword,
+            open_now=False  # Set to True to only find places open now
+        )
     
     print(f"\nFound {len(results)} total places!")
     print("-" * 60)
     
-    # Process and display results
-    for i, place in enumerate(results[:10], 1):  # Show first 10 results
-        formatted_place = places_api.format_place_info(place)
-        
-        print(f"{i}. {formatted_place['name']}")
-        print(f"   Rating: {formatted_place['rating']} ({formatted_place['user_ratings_total']} reviews)")
-        print(f"   Address: {formatted_place['vicinity']}")
-        print(f"   Types: {', '.join(formatted_place['types'][:3])}")  # Show first 3 types
-        print(f"   Coordinates: {formatted_place['geometry']['lat']}, {formatted_place['geometry']['lng']}")
-        if formatted_place['open_now'] != 'Unknown':
-            print(f"   Open now: {formatted_place['open_now']}")
+    # Process results once for both display and saving
+    formatted_results = [places_api.format_place_info(place) for place in results]
+    
+    # Display results
+    for i, formatted_place in enumerate(formatted_results[:10], 1):  # Show first 10 results
+        print(f"{i}. {formatted_place.name}")
+        print(f"   Rating: {formatted_place.rating} ({formatted_place.user_ratings_total} reviews)")
+        print(f"   Address: {formatted_place.vicinity}")
+        print(f"   Types: {', '.join(formatted_place.types[:3])}")  # Show first 3 types
+        print(f"   Coordinates: {formatted_place.lat}, {formatted_place.lng}")
+        if formatted_place.open_now != 'Unknown':
+            print(f"   Open now: {formatted_place.open_now}")
         print()
     
-    # Save results to JSON file
-    with open('nearby_places.json', 'w', encoding='utf-8') as f:
-        json.dump([places_api.format_place_info(place) for place in results], f, indent=2, ensure_ascii=False)
+    # Save results to JSON file, converting each PlaceInfo as the serializer reaches it
+    if orjson is not None:
+        payload = orjson.dumps(formatted_results, default=PlaceInfo.to_dict,
+                               option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATACLASS)
+        with open('nearby_places.json', 'wb') as f:
+            f.write(payload)
+    else:
+        with open('nearby_places.json', 'w', encoding='utf-8') as f:
+            json.dump(formatted_results, f, indent=2, ensure_ascii=False, default=PlaceInfo.to_dict)
     
     print(f"All {len(results)} results saved to 'nearby_places.json'")
 
@@ -1,43 +1,144 @@
 import json
 import pandas as pd
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, NamedStyle
+from openpyxl.utils import get_column_letter
 import os
+import fnmatch
 import glob
+import mmap
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import ijson
+except ImportError:  # large files are then loaded with json.load like any other
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib json module
+    orjson = None
+
+try:
+    import xlsxwriter
+except ImportError:  # large simple exports then use openpyxl as well
+    xlsxwriter = None
+
+IJSON_ERRORS = (ijson.JSONError,) if ijson is not None else ()
+
+# Files larger than this are stream-parsed record by record instead of loaded whole
+STREAMING_THRESHOLD_BYTES = 50_000_000
+STREAMING_CHUNK_SIZE = 10_000
+
+# Files larger than this are memory-mapped when parsed with orjson
+MMAP_THRESHOLD_BYTES = 10_000_000
+
+# Upper bound on threads used to read JSON files in parallel
+MAX_LOAD_WORKERS = 8
+
+# Styled exports estimate column widths from at most this many sampled rows
+WIDTH_SAMPLE_ROWS = 500
+
+# Simple exports with more rows than this are written by the faster xlsxwriter engine
+XLSXWRITER_ROW_THRESHOLD = 5000
+
 class MultipleJSONToSingleExcelConverter:
     def __init__(self):
         self.json_data = {}  # Dictionary to store JSON data from multiple files
         self.combined_df = None  # Single DataFrame for all data
+        self._save_executor = None  # Worker processes for background Excel saves
+        self._save_futures = []  # (output_file, Future) pairs for pending background saves
     
     def load_multiple_json_files(self, file_paths):
         """Load multiple JSON files"""
         successful_loads = 0
         
-        for file_path in file_paths:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    data = json.load(file)
-                    filename = Path(file_path).stem
+        # Read and parse files in parallel; results are collected in the original order
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_LOAD_WORKERS, len(file_paths)))) as executor:
+            futures = [(file_path, executor.submit(self._load_one, file_path)) for file_path in file_paths]
+            
+            for file_path, future in futures:
+                try:
+                    filename, data = future.result()
                     self.json_data[filename] = data
                     print(f"✅ Successfully loaded: {file_path}")
                     successful_loads += 1
-            except FileNotFoundError:
-                print(f"❌ File not found: {file_path}")
-            except json.JSONDecodeError as e:
-                print(f"❌ Invalid JSON in {file_path}: {e}")
-            except Exception as e:
-                print(f"❌ Error loading {file_path}: {e}")
+                except FileNotFoundError:
+                    print(f"❌ File not found: {file_path}")
+                except json.JSONDecodeError as e:
+                    print(f"❌ Invalid JSON in {file_path}: {e}")
+                except IJSON_ERRORS as e:
+                    print(f"❌ Invalid JSON in {file_path}: {e}")
+                except Exception as e:
+                    print(f"❌ Error loading {file_path}: {e}")
         
         print(f"📊 Total files loaded: {successful_loads}")
         return successful_loads > 0
     
+    def _load_one(self, file_path):
+        """Load a single JSON file, returning its name and parsed data"""
+        if self._should_stream(file_path):
+            data = self._stream_json_array(file_path)
+        elif orjson is not None:
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so errors are reported the same way
+            with open(file_path, 'rb') as file:
+                if os.fstat(file.fileno()).st_size > MMAP_THRESHOLD_BYTES:
+                    # Parse straight from the page cache instead of copying the file into memory
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        with memoryview(mapped) as buffer:
+                            data = orjson.loads(buffer)
+                else:
+                    data = orjson.loads(file.read())
+        else:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        return Path(file_path).stem, data
+    
+    def _should_stream(self, file_path):
+        """Check whether a file is a large top-level JSON array worth streaming"""
+        if ijson is None or os.path.getsize(file_path) <= STREAMING_THRESHOLD_BYTES:
+            return False
+        with open(file_path, 'rb') as file:
+            # Only top-level arrays can be streamed item by item
+            while True:
+                char = file.read(1)
+                if not char or not char.isspace():
+                    return char == b'['
+    
+    def _stream_json_array(self, file_path):
+        """Stream-parse a large JSON array into a DataFrame, one chunk of records at a time"""
+        chunks = []
+        records = []
+        with open(file_path, 'rb') as file:
+            for record in ijson.items(file, 'item', use_float=True):
+                records.append(record)
+                if len(records) >= STREAMING_CHUNK_SIZE:
+                    chunks.append(pd.json_normalize(records))
+                    records = []
+        if records or not chunks:
+            chunks.append(pd.json_normalize(records))
+        return pd.concat(chunks, ignore_index=True, sort=False)
+    
     def load_from_directory(self, directory_path, pattern="*.json"):
         """Load all JSON files from a directory"""
-        json_files = glob.glob(os.path.join(directory_path, pattern))
+        if os.sep in pattern or '/' in pattern:
+            # Patterns with a directory part need glob's path matching
+            json_files = sorted(glob.glob(os.path.join(directory_path, pattern)))
+        else:
+            try:
+                # scandir entries carry their file type, so matching needs no extra stat calls;
+                # like glob, hidden files only match patterns that start with a dot
+                skip_hidden = not pattern.startswith('.')
+                with os.scandir(directory_path) as entries:
+                    json_files = sorted(entry.path for entry in entries
+                                        if not (skip_hidden and entry.name.startswith('.'))
+                                        and fnmatch.fnmatch(entry.name, pattern)
+                                        and entry.is_file())
+            except (FileNotFoundError, NotADirectoryError):
+                json_files = []
         if not json_files:
             print(f"❌ No JSON files found in {directory_path}")
             return False
@@ -45,56 +146,78 @@ class MultipleJSONToSingleExcelConverter:
         print(f"Found {len(json_files)} JSON files in {directory_path}")
         return self.load_multiple_json_files(json_files)
     
-    def combine_json_data(self, add_source_column=True):
-        """Combine all JSON data into a single DataFrame"""
+    def combine_json_data(self, add_source_column=True, max_level=None):
+        """Combine all JSON data into a single DataFrame, flattening nested objects up to max_level
+        
+        max_level does not apply to large files that were stream-parsed by
+        load_multiple_json_files: those are fully flattened at load time.
+        """
         if not self.json_data:
             print("❌ No JSON data loaded")
             return False
         
-        all_dataframes = []
+        # Records from consecutive files are normalized together in a single pass;
+        # files that were already normalized while streaming stay as DataFrames.
+        # Parts are kept in file order: each one is either a DataFrame or a list of records
+        parts = []
         
         for filename, data in self.json_data.items():
             try:
-                # Convert JSON to DataFrame
+                if isinstance(data, pd.DataFrame):
+                    # Large file that was already normalized while streaming
+                    df = data.assign(source_file=filename) if add_source_column else data
+                    parts.append(df)
+                    print(f"✅ Processed {filename}: {len(df)} rows, {len(df.columns)} columns")
+                    continue
+                
+                # Collect the records held in this file
                 if isinstance(data, list):
                     # JSON is an array of objects
-                    df = pd.json_normalize(data)
+                    records = data
                 elif isinstance(data, dict):
-                    # Handle different dict structures
-                    if any(isinstance(v, list) for v in data.values()):
-                        # Find the first list and use it
-                        for key, value in data.items():
-                            if isinstance(value, list):
-                                df = pd.json_normalize(value)
-                                break
-                    else:
-                        # Single object - convert to single row
-                        df = pd.json_normalize([data])
+                    # Use the first list in the dict, or treat it as a single object (one row)
+                    records = next((value for value in data.values() if isinstance(value, list)), [data])
                 else:
                     print(f"⚠️ Skipping {filename}: Unsupported data structure")
                     continue
                 
                 # Add source column to track which file the data came from
                 if add_source_column:
-                    df['source_file'] = filename
+                    records = [{**record, 'source_file': filename} for record in records]
+                elif not all(isinstance(record, dict) for record in records):
+                    raise TypeError("records must be JSON objects")
                 
-                all_dataframes.append(df)
-                print(f"✅ Processed {filename}: {len(df)} rows, {len(df.columns)} columns")
+                if parts and isinstance(parts[-1], list):
+                    parts[-1].extend(records)
+                else:
+                    parts.append(list(records))
+                print(f"✅ Processed {filename}: {len(records)} rows")
                 
             except Exception as e:
                 print(f"❌ Error processing {filename}: {e}")
                 continue
         
-        if not all_dataframes:
+        if not parts:
             print("❌ No data could be processed")
             return False
         
         try:
-            # Combine all DataFrames
-            self.combined_df = pd.concat(all_dataframes, ignore_index=True, sort=False)
+            # Combine all data
+            all_dataframes = [pd.json_normalize(part, max_level=max_level) if isinstance(part, list) else part
+                              for part in parts]
+            if len(all_dataframes) == 1:
+                self.combined_df = all_dataframes[0]
+            else:
+                # Align every frame to one column order up front so concat is a plain vertical stack
+                union_columns = list(dict.fromkeys(column for df in all_dataframes for column in df.columns))
+                all_dataframes = [df if list(df.columns) == union_columns else df.reindex(columns=union_columns)
+                                  for df in all_dataframes]
+                self.combined_df = pd.concat(all_dataframes, ignore_index=True, sort=False)
             
-            # Fill NaN values with empty strings for better Excel output
-            self.combined_df = self.combined_df.fillna('')
+            # Fill NaN values with empty strings for better Excel output; numeric
+            # columns keep their native dtype and are written as blank cells
+            text_columns = self.combined_df.select_dtypes(exclude=['number', 'bool']).columns
+            self.combined_df = self.combined_df.fillna({column: '' for column in text_columns})
             
             print(f"✅ Combined data: {len(self.combined_df)} total rows, {len(self.combined_df.columns)} columns")
             return True
@@ -103,71 +226,77 @@ class MultipleJSONToSingleExcelConverter:
             print(f"❌ Error combining DataFrames: {e}")
             return False
     
-    def save_to_excel_simple(self, output_file):
-        """Save combined DataFrame to Excel (simple method)"""
+    def save_to_excel_simple(self, output_file, columns=None):
+        """Save combined DataFrame to Excel (simple method), optionally only the given columns"""
         if self.combined_df is None:
             print("❌ No combined data available")
             return False
         
         try:
-            self.combined_df.to_excel(output_file, index=False, engine='openpyxl')
+            df = self.combined_df[columns] if columns else self.combined_df
+            if xlsxwriter is not None and len(df) > XLSXWRITER_ROW_THRESHOLD:
+                # constant_memory is not usable here: to_excel writes cells column by column,
+                # and constant-memory mode silently drops cells that arrive out of row order
+                engine_kwargs = {'options': {'strings_to_urls': False}}
+                with pd.ExcelWriter(output_file, engine='xlsxwriter', engine_kwargs=engine_kwargs) as writer:
+                    df.to_excel(writer, index=False)
+            else:
+                df.to_excel(output_file, index=False, engine='openpyxl')
             print(f"✅ Successfully saved to {output_file}")
             return True
         except Exception as e:
             print(f"❌ Error saving to Excel: {e}")
             return False
     
-    def save_to_excel_styled(self, output_file):
-        """Save combined DataFrame to Excel with styling"""
+    def save_to_excel_styled(self, output_file, columns=None):
+        """Save combined DataFrame to Excel with styling, optionally only the given columns"""
         if self.combined_df is None:
             print("❌ No combined data available")
             return False
         
         try:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Combined JSON Data"
+            df = self.combined_df[columns] if columns else self.combined_df
             
-            # Add data to worksheet
-            for r in dataframe_to_rows(self.combined_df, index=False, header=True):
-                ws.append(r)
+            # Convert values up front: a cell that fails mid-write leaves the write-only sheet half open
+            df = self._excel_safe(df)
             
-            # Style the header row
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
+            # Write-only mode streams rows to disk instead of keeping every cell in memory
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Combined JSON Data")
             
-            for cell in ws[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
+            # Register styles once on the workbook rather than building them per cell
+            header_style = NamedStyle(name="header")
+            header_style.font = Font(bold=True, color="FFFFFF")
+            header_style.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+            header_style.alignment = Alignment(horizontal="center", vertical="center")
+            alt_row_style = NamedStyle(name="alt_row")
+            alt_row_style.fill = PatternFill(start_color="F8F9FA", end_color="F8F9FA", fill_type="solid")
+            source_style = NamedStyle(name="source_file")
+            source_style.fill = PatternFill(start_color="E8F4FD", end_color="E8F4FD", fill_type="solid")
+            for style in (header_style, alt_row_style, source_style):
+                wb.add_named_style(style)
             
-            # Auto-adjust column widths
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
+            # Auto-adjust column widths (must be set before any rows are written)
+            header = list(df.columns)
+            for col_idx, width in enumerate(self._column_widths(df), 1):
+                ws.column_dimensions[get_column_letter(col_idx)].width = width
             
-            # Add alternating row colors
-            light_fill = PatternFill(start_color="F8F9FA", end_color="F8F9FA", fill_type="solid")
-            for row_num in range(2, ws.max_row + 1):
-                if row_num % 2 == 0:
-                    for cell in ws[row_num]:
-                        cell.fill = light_fill
+            # Style the header row
+            ws.append([self._styled_cell(ws, column, "header") for column in header])
             
             # Highlight source_file column if it exists
-            if 'source_file' in self.combined_df.columns:
-                source_col_idx = list(self.combined_df.columns).index('source_file') + 1
-                source_fill = PatternFill(start_color="E8F4FD", end_color="E8F4FD", fill_type="solid")
-                for row in range(2, ws.max_row + 1):
-                    ws.cell(row=row, column=source_col_idx).fill = source_fill
+            source_col_idx = header.index('source_file') if 'source_file' in header else None
+            
+            for row_num, values in enumerate(df.itertuples(index=False, name=None), 2):
+                # Add alternating row colors; odd rows go out as plain values
+                if row_num % 2 == 0:
+                    row = (self._styled_cell(ws, value, "alt_row") for value in values)
+                else:
+                    row = values
+                if source_col_idx is not None:
+                    row = list(row)
+                    row[source_col_idx] = self._styled_cell(ws, values[source_col_idx], "source_file")
+                ws.append(row)
             
             wb.save(output_file)
             print(f"✅ Successfully saved styled Excel file to {output_file}")
@@ -176,6 +305,80 @@ class MultipleJSONToSingleExcelConverter:
             print(f"❌ Error saving styled Excel: {e}")
             return False
     
+    def save_to_excel_in_background(self, output_file, styled=False, columns=None):
+        """Save combined DataFrame to Excel in a worker process; returns a Future with the result"""
+        if self.combined_df is None:
+            print("❌ No combined data available")
+            return None
+        
+        if self._save_executor is None:
+            self._save_executor = ProcessPoolExecutor(max_workers=2)
+        
+        # Only the projected columns are sent to the worker
+        df = self.combined_df[columns] if columns else self.combined_df
+        future = self._save_executor.submit(self._save_worker, df, output_file, styled)
+        self._save_futures.append((output_file, future))
+        return future
+    
+    def wait_for_background_saves(self):
+        """Wait for all background Excel saves to finish; returns whether every save succeeded"""
+        all_saved = True
+        for output_file, future in self._save_futures:
+            try:
+                # The worker reports its own result; this catches jobs that never ran or crashed
+                if not future.result():
+                    all_saved = False
+            except Exception as e:
+                print(f"❌ Background save to {output_file} failed: {e}")
+                all_saved = False
+        self._save_futures = []
+        
+        if self._save_executor is not None:
+            self._save_executor.shutdown(wait=True)
+            self._save_executor = None
+        return all_saved
+    
+    @staticmethod
+    def _save_worker(df, output_file, styled):
+        """Write a DataFrame to Excel inside a worker process"""
+        converter = MultipleJSONToSingleExcelConverter()
+        converter.combined_df = df
+        if styled:
+            return converter.save_to_excel_styled(output_file)
+        return converter.save_to_excel_simple(output_file)
+    
+    def _excel_safe(self, df):
+        """Return df with nested values (lists, dicts) that Excel cells can't hold turned into strings"""
+        converted = None
+        for col_idx, dtype in enumerate(df.dtypes):
+            if dtype != object:
+                continue
+            column = df.iloc[:, col_idx]
+            nested = column.map(lambda value: isinstance(value, (list, dict, tuple, set)))
+            if nested.any():
+                if converted is None:
+                    converted = df.copy()
+                converted.iloc[:, col_idx] = column.where(~nested, column.astype(str))
+        return df if converted is None else converted
+    
+    def _column_widths(self, df, max_width=50):
+        """Compute Excel column widths from the longest value (or header) in each column"""
+        if len(df) > WIDTH_SAMPLE_ROWS:
+            # Estimate from a fixed-size sample rather than scanning every row
+            df = df.sample(WIDTH_SAMPLE_ROWS, random_state=0)
+        if len(df):
+            value_lengths = df.astype(str).apply(lambda column: column.str.len()).max().to_numpy()
+        else:
+            value_lengths = [0] * len(df.columns)
+        return [min(max(len(str(column)), int(length)) + 2, max_width)
+                for column, length in zip(df.columns, value_lengths)]
+    
+    def _styled_cell(self, ws, value, style):
+        """Create a write-only cell carrying one of the workbook's named styles"""
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+    
     def preview_combined_data(self, rows=10):
         """Preview the combined DataFrame"""
         if self.combined_df is None:
@@ -321,8 +524,10 @@ if __name__ == "__main__":
     # Preview data
     converter.preview_combined_data()
     
-    # Save to Excel
-    converter.save_to_excel_simple("combined_data.xlsx")
+    # Save to Excel in a worker process
+    converter.save_to_excel_in_background("combined_data.xlsx")
     
-    # Get summary stats
-    converter.get_summary_stats()
\ No newline at end of file
+    # Get summary stats while the file is written
+    converter.get_summary_stats()
+    
+    converter.wait_for_background_saves()
\ No newline at end of file
@@ -0,0 +1,72 @@
+import glob
+import os
+
+import pandas as pd
+
+from jsontoexcel import MultipleJSONToSingleExcelConverter, XLSXWRITER_ROW_THRESHOLD
+
+
+def test_save_to_excel_simple_round_trips_large_frame(tmp_path):
+    rows = XLSXWRITER_ROW_THRESHOLD + 1000
+    converter = MultipleJSONToSingleExcelConverter()
+    converter.combined_df = pd.DataFrame({
+        'id': range(rows),
+        'name': [f"place {i}" for i in range(rows)],
+        'rating': [i / 10 for i in range(rows)]
+    })
+    output_file = tmp_path / "large.xlsx"
+
+    assert converter.save_to_excel_simple(output_file)
+
+    pd.testing.assert_frame_equal(pd.read_excel(output_file), converter.combined_df,
+                                  check_dtype=False)
+
+
+def test_combine_json_data_keeps_file_order_with_streamed_frames():
+    converter = MultipleJSONToSingleExcelConverter()
+    converter.json_data = {
+        'first': [{'x': 1}],
+        'streamed': pd.DataFrame({'x': [2]}),
+        'second': [{'x': 3}]
+    }
+
+    assert converter.combine_json_data()
+
+    assert converter.combined_df['x'].tolist() == [1, 2, 3]
+    assert converter.combined_df['source_file'].tolist() == ['first', 'streamed', 'second']
+
+
+def test_combine_json_data_leaves_loaded_frames_untouched():
+    streamed = pd.DataFrame({'s': ['a', None], 'n': [1.0, None]})
+    converter = MultipleJSONToSingleExcelConverter()
+    converter.json_data = {'big': streamed}
+
+    assert converter.combine_json_data(add_source_column=False)
+
+    assert converter.combined_df is not streamed
+    assert converter.combined_df['s'].tolist() == ['a', '']
+    assert streamed['s'].isna().tolist() == [False, True]
+
+
+def test_load_from_directory_matches_glob_patterns(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in ("a.json", ".hidden.json", "sub/b.json"):
+        (tmp_path / name).write_text('[{"x": 1}]')
+
+    for pattern in ("*.json", ".*.json", "sub/*.json", "*/*.json"):
+        converter = MultipleJSONToSingleExcelConverter()
+        assert converter.load_from_directory(str(tmp_path), pattern)
+        expected = sorted(os.path.basename(path)[:-len(".json")]
+                          for path in glob.glob(os.path.join(str(tmp_path), pattern)))
+        assert sorted(converter.json_data) == expected
+
+
+def test_wait_for_background_saves_reports_failed_jobs(tmp_path):
+    converter = MultipleJSONToSingleExcelConverter()
+    converter.combined_df = pd.DataFrame({'x': [1, 2]})
+
+    converter.save_to_excel_in_background(tmp_path / "ok.xlsx")
+    converter.save_to_excel_in_background(tmp_path / "missing" / "bad.xlsx")
+
+    assert not converter.wait_for_background_saves()
+    assert pd.read_excel(tmp_path / "ok.xlsx")['x'].tolist() == [1, 2]
@@ -0,0 +1,33 @@
+from NearbyPlaces import GooglePlacesNearbySearch
+
+
+def flatten(place_info):
+    formatted = place_info.to_dict()
+    geometry = formatted.pop('geometry')
+    return {**formatted, 'lat': geometry['lat'], 'lng': geometry['lng']}
+
+
+def test_format_places_batch_matches_format_place_info():
+    places_api = GooglePlacesNearbySearch("test-key", use_cache=False)
+    results = [
+        {
+            'name': 'Cafe',
+            'place_id': 'p1',
+            'rating': 4.5,
+            'user_ratings_total': 12,
+            'price_level': 2,
+            'types': ['cafe', 'food'],
+            'vicinity': '1 Main St',
+            'geometry': {'location': {'lat': 47.68, 'lng': -122.35}},
+            'opening_hours': {'open_now': True},
+            'photos': [{'photo_reference': 'abc'}]
+        },
+        {'name': 'Park', 'place_id': 'p2', 'rating': 3, 'types': ['park']},
+        {'place_id': 'p3'}
+    ]
+
+    batch = places_api.format_places_batch(results)
+
+    expected = [flatten(places_api.format_place_info(place)) for place in results]
+    assert batch.to_dict('records') == expected
+    places_api.close()